@@ -6,6 +6,19 @@ from tkinter import font, messagebox  # Componentes específicos de tkinter para
 from PIL import Image, ImageTk       # Biblioteca Pillow (PIL) para manipular imágenes. Se usa para mostrar el árbol.
 import graphviz                     # Biblioteca para crear visualizaciones de grafos, usada para dibujar el árbol.
 import os                           # Biblioteca para interactuar con el sistema operativo (aunque no se usa activamente aquí).
+import io                           # Permite abrir con Pillow el PNG generado por Graphviz directamente desde memoria.
+import bisect                       # Búsqueda binaria en listas ordenadas, para mantener las claves siempre ordenadas.
+from collections import OrderedDict # Diccionario ordenado, usado como caché LRU de las imágenes renderizadas.
+from concurrent.futures import ThreadPoolExecutor, CancelledError # Hilo de trabajo para generar las imágenes sin bloquear la ventana.
+
+# A partir de cuántas claves en una sola inserción se reconstruye el AVL completo (ordenando
+# todas las claves) en lugar de insertarlas una a una. Solo para cargas muy grandes, porque la
+# reconstrucción descarta la forma que tenía el AVL.
+UMBRAL_INSERCION_MASIVA = 10_000
+# Número máximo de imágenes de árboles que se guardan en caché para no volver a llamar a Graphviz.
+TAMANO_CACHE_RENDER = 16
+# Cada cuántos milisegundos se comprueba desde Tkinter si terminó el renderizado en segundo plano.
+INTERVALO_REVISION_RENDER_MS = 30
 
 # ==============================================================================
 # --- LÓGICA DE ÁRBOLES (Nodo y Funciones de Conteo) ---
@@ -17,84 +30,130 @@ class Nodo:
     referencias a sus hijos izquierdo y derecho, y su altura.
     La altura es crucial para el balanceo en los árboles AVL.
     """
+    # Atributos fijos: sin '__dict__' por nodo, cada nodo ocupa menos memoria y el acceso es más rápido.
+    __slots__ = ('clave', 'clave_texto', 'izquierdo', 'derecho', 'altura')
+
     def __init__(self, clave):
         self.clave = clave          # El valor almacenado en el nodo.
+        self.clave_texto = str(clave) # La clave como texto, calculada una sola vez para dibujar el árbol.
         self.izquierdo = None       # Referencia al nodo hijo izquierdo (None si no tiene).
         self.derecho = None         # Referencia al nodo hijo derecho (None si no tiene).
         self.altura = 1             # Altura del nodo. Un nodo nuevo (hoja) siempre tiene altura 1.
 
-def construir_arbol_perfecto(claves):
+def construir_arbol_perfecto(claves, ya_ordenadas=False):
     """
     Construye un árbol binario de búsqueda lo más balanceado posible a partir de una lista de claves.
     No es un AVL, sino que se genera una única vez de forma óptima.
+    Si 'ya_ordenadas' es True, se asume que las claves ya vienen ordenadas y sin duplicados.
     """
     if not claves: return None
-    # Elimina duplicados y ordena las claves para facilitar la construcción.
-    claves_ordenadas = sorted(list(set(claves)))
-
-    def construir_recursivo(sub_claves):
-        # Caso base: si no hay claves en la sublista, no hay subárbol.
-        if not sub_claves: return None
+    # Elimina duplicados y ordena las claves para facilitar la construcción (si hace falta).
+    claves_ordenadas = claves if ya_ordenadas else sorted(list(set(claves)))
+
+    def construir_recursivo(inicio, fin):
+        # Cada subárbol se describe con el rango [inicio, fin) de la lista ordenada, en lugar de
+        # copiar sublistas en cada llamada.
+        # Caso base: si el rango está vacío, no hay subárbol.
+        if inicio >= fin: return None
         # Se elige el elemento del medio como raíz del subárbol.
         # Esto garantiza que el árbol esté balanceado.
-        indice_medio = len(sub_claves) // 2
-        raiz = Nodo(sub_claves[indice_medio])
+        indice_medio = (inicio + fin) // 2
+        raiz = Nodo(claves_ordenadas[indice_medio])
         # Se construye recursivamente el subárbol izquierdo con la mitad inferior de las claves.
-        raiz.izquierdo = construir_recursivo(sub_claves[:indice_medio])
+        raiz.izquierdo = construir_recursivo(inicio, indice_medio)
         # Se construye recursivamente el subárbol derecho con la mitad superior.
-        raiz.derecho = construir_recursivo(sub_claves[indice_medio + 1:])
+        raiz.derecho = construir_recursivo(indice_medio + 1, fin)
+        # Se guarda la altura en el nodo (igual que en el AVL) para no tener que recalcularla después.
+        raiz.altura = 1 + max(raiz.izquierdo.altura if raiz.izquierdo else 0, raiz.derecho.altura if raiz.derecho else 0)
         return raiz
     
-    return construir_recursivo(claves_ordenadas)
+    return construir_recursivo(0, len(claves_ordenadas))
 
 # --- Funciones para calcular estadísticas del árbol ---
 
-def contar_nodos(nodo):
-    """Cuenta el número total de nodos en un árbol de forma recursiva."""
-    if not nodo: return 0
-    return 1 + contar_nodos(nodo.izquierdo) + contar_nodos(nodo.derecho)
-
-def contar_hojas(nodo):
-    """Cuenta el número de nodos hoja (nodos sin hijos) de forma recursiva."""
-    if not nodo: return 0
-    # Caso base: un nodo es una hoja si no tiene hijo izquierdo ni derecho.
-    if not nodo.izquierdo and not nodo.derecho: return 1
-    # Suma las hojas de los subárboles izquierdo y derecho.
-    return contar_hojas(nodo.izquierdo) + contar_hojas(nodo.derecho)
-
-def calcular_altura_arbol(nodo):
-    """Calcula la altura de un árbol (la longitud del camino más largo desde la raíz a una hoja)."""
-    if not nodo: return 0
-    # La altura es 1 (el nodo actual) más la altura del subárbol más alto.
-    return 1 + max(calcular_altura_arbol(nodo.izquierdo), calcular_altura_arbol(nodo.derecho))
-
-def calcular_grado_arbol(nodo):
-    """Calcula el grado del árbol (el número máximo de hijos que tiene cualquier nodo)."""
-    if not nodo: return 0
-    grado_actual = 0
-    if nodo.izquierdo: grado_actual += 1
-    if nodo.derecho: grado_actual += 1
-    # Si un nodo ya tiene grado 2, el grado del árbol será 2 (el máximo en un árbol binario).
-    if grado_actual == 2: return 2
-    # El grado del árbol es el máximo entre el grado del nodo actual y el de sus subárboles.
-    return max(grado_actual, calcular_grado_arbol(nodo.izquierdo), calcular_grado_arbol(nodo.derecho))
+def estadisticas(nodo):
+    """
+    Calcula en un único recorrido (por niveles, sin recursión) el número de nodos, de hojas,
+    la altura y el grado del árbol. Devuelve la tupla (nodos, hojas, altura, grado).
+    """
+    nodos = hojas = altura = grado = 0
+    nivel = [nodo] if nodo else []
+    while nivel:
+        altura += 1  # Cada nivel no vacío suma uno a la altura.
+        siguiente = []
+        for actual in nivel:
+            nodos += 1
+            hijos = 0
+            if actual.izquierdo: siguiente.append(actual.izquierdo); hijos += 1
+            if actual.derecho: siguiente.append(actual.derecho); hijos += 1
+            # Un nodo sin hijos es una hoja; si no, cuenta para el grado (que como mucho es 2).
+            if hijos == 0: hojas += 1
+            elif hijos > grado: grado = hijos
+        nivel = siguiente
+    return (nodos, hojas, altura, grado)
+
+def firma_estructura(nodo):
+    """
+    Devuelve una tupla anidada (clave_texto, firma_izquierda, firma_derecha) que identifica la forma
+    y el contenido del árbol. Dos árboles con la misma firma se dibujan igual. Al ser inmutable,
+    sirve también como copia del árbol que se puede dibujar desde otro hilo.
+    """
+    if not nodo: return None
+    return (nodo.clave_texto, firma_estructura(nodo.izquierdo), firma_estructura(nodo.derecho))
+
+def generar_dot(firma):
+    """
+    Genera el texto en lenguaje DOT (el formato de Graphviz) que describe el árbol dado por su firma.
+    Se recorre la firma con una pila explícita y se construye todo el texto con un único join.
+    """
+    partes = ['digraph Arbol{node[shape=circle,style=filled,fillcolor=skyblue];']
+    pila = [firma] if firma else []
+    while pila:
+        texto, izquierdo, derecho = pila.pop()
+        partes.append(f'"{texto}";')
+        # Las aristas se escriben primero hacia la izquierda para que Graphviz respete el orden de los hijos.
+        if izquierdo: partes.append(f'"{texto}"->"{izquierdo[0]}";')
+        if derecho: partes.append(f'"{texto}"->"{derecho[0]}";'); pila.append(derecho)
+        if izquierdo: pila.append(izquierdo)
+    partes.append('}')
+    return "".join(partes)
 
 # ==============================================================================
 # --- CLASE ArbolAVL ---
 # ==============================================================================
 class ArbolAVL:
     """Implementa la lógica completa de un Árbol AVL, incluyendo inserción,
-    eliminación y las rotaciones necesarias para el auto-balanceo."""
-
-    def obtener_altura(self, raiz):
-        """Devuelve de forma segura la altura de un nodo, manejando el caso de que sea None."""
-        if not raiz: return 0
-        return raiz.altura
-
-    def obtener_balance(self, raiz):
-        """Calcula el factor de balance de un nodo (diferencia de alturas de subárboles)."""
-        if not raiz: return 0
-        return self.obtener_altura(raiz.izquierdo) - self.obtener_altura(raiz.derecho)
+    eliminación y las rotaciones necesarias para el auto-balanceo.
+    Además lleva la cuenta de hojas y de nodos con dos hijos del árbol que gestiona,
+    actualizándola en cada inserción, eliminación y rotación.
+    Importante: esos contadores pertenecen a un único árbol. Cada instancia debe usarse
+    siempre con la misma raíz; llamar a insertar/eliminar con otra raíz los deja incorrectos.
+    Si la raíz se sustituye por otra (al reconstruirla o vaciarla), hay que llamar a
+    recalcular_estadisticas con la nueva."""
+
+    def __init__(self):
+        self.hojas = 0              # Número de nodos sin hijos.
+        self.nodos_completos = 0    # Número de nodos con dos hijos (si hay alguno, el grado del árbol es 2).
+
+    def recalcular_estadisticas(self, raiz):
+        """Vuelve a contar hojas y nodos completos recorriendo el árbol (tras reconstruirlo o vaciarlo)."""
+        self.hojas = self.nodos_completos = 0
+        pila = [raiz] if raiz else []
+        while pila:
+            nodo = pila.pop()
+            if nodo.izquierdo: pila.append(nodo.izquierdo)
+            if nodo.derecho: pila.append(nodo.derecho)
+            if not nodo.izquierdo and not nodo.derecho: self.hojas += 1
+            elif nodo.izquierdo and nodo.derecho: self.nodos_completos += 1
+
+    def _contar_tipos(self, nodos):
+        """Devuelve cuántos de los nodos dados son hojas y cuántos tienen dos hijos."""
+        hojas = completos = 0
+        for nodo in nodos:
+            if nodo is None: continue
+            if not nodo.izquierdo and not nodo.derecho: hojas += 1
+            elif nodo.izquierdo and nodo.derecho: completos += 1
+        return hojas, completos
 
     def rotacion_derecha(self, z):
         """Realiza una rotación simple a la derecha sobre el nodo z."""
@@ -106,8 +165,9 @@ class ArbolAVL:
         z.izquierdo = T3    # El antiguo subárbol derecho de y se convierte en el hijo izquierdo de z.
 
         # Actualizar alturas (importante hacerlo en este orden: primero el nodo que bajó, luego el que subió).
-        z.altura = 1 + max(self.obtener_altura(z.izquierdo), self.obtener_altura(z.derecho))
-        y.altura = 1 + max(self.obtener_altura(y.izquierdo), self.obtener_altura(y.derecho))
+        # Las alturas se leen directamente del atributo (0 si el hijo es None), porque esta es la parte más usada.
+        z.altura = 1 + max(T3.altura if T3 else 0, z.derecho.altura if z.derecho else 0)
+        y.altura = 1 + max(y.izquierdo.altura if y.izquierdo else 0, z.altura)
 
         return y  # Devolvemos la nueva raíz del subárbol.
 
@@ -121,85 +181,124 @@ class ArbolAVL:
         z.derecho = T2        # El antiguo subárbol izquierdo de y se convierte en el hijo derecho de z.
 
         # Actualizar alturas
-        z.altura = 1 + max(self.obtener_altura(z.izquierdo), self.obtener_altura(z.derecho))
-        y.altura = 1 + max(self.obtener_altura(y.izquierdo), self.obtener_altura(y.derecho))
+        z.altura = 1 + max(z.izquierdo.altura if z.izquierdo else 0, T2.altura if T2 else 0)
+        y.altura = 1 + max(z.altura, y.derecho.altura if y.derecho else 0)
 
         return y  # Devolvemos la nueva raíz del subárbol.
         
-    def insertar(self, raiz, clave):
-        """Inserta una clave en el árbol y realiza el balanceo si es necesario."""
-        # 1. Inserción estándar de un Árbol Binario de Búsqueda (BST)
-        if not raiz: return Nodo(clave)
-        elif clave < raiz.clave: raiz.izquierdo = self.insertar(raiz.izquierdo, clave)
-        else: raiz.derecho = self.insertar(raiz.derecho, clave)
-
-        # 2. Actualizar la altura del nodo ancestro actual
-        raiz.altura = 1 + max(self.obtener_altura(raiz.izquierdo), self.obtener_altura(raiz.derecho))
-
-        # 3. Obtener el factor de balance para ver si el nodo se ha desbalanceado
-        balance = self.obtener_balance(raiz)
-
-        # 4. Si hay desbalance, aplicar una de las 4 rotaciones posibles
-        # Caso Izquierda-Izquierda (LL) -> Rotación Derecha Simple
-        if balance > 1 and clave < raiz.izquierdo.clave:
-            return self.rotacion_derecha(raiz)
-        # Caso Derecha-Derecha (RR) -> Rotación Izquierda Simple
-        if balance < -1 and clave > raiz.derecho.clave:
-            return self.rotacion_izquierda(raiz)
-        # Caso Izquierda-Derecha (LR) -> Rotación Izquierda y luego Derecha
-        if balance > 1 and clave > raiz.izquierdo.clave:
-            raiz.izquierdo = self.rotacion_izquierda(raiz.izquierdo)
-            return self.rotacion_derecha(raiz)
-        # Caso Derecha-Izquierda (RL) -> Rotación Derecha y luego Izquierda
-        if balance < -1 and clave < raiz.derecho.clave:
-            raiz.derecho = self.rotacion_derecha(raiz.derecho)
-            return self.rotacion_izquierda(raiz)
-        
+    def _balancear(self, raiz):
+        """Actualiza la altura de un nodo y, si está desbalanceado, aplica la rotación
+        correspondiente. Devuelve la nueva raíz del subárbol."""
+        # Cada altura se lee una sola vez y se reutiliza para la altura y para el factor de balance.
+        izquierdo, derecho = raiz.izquierdo, raiz.derecho
+        altura_izq = izquierdo.altura if izquierdo else 0
+        altura_der = derecho.altura if derecho else 0
+        raiz.altura = 1 + max(altura_izq, altura_der)
+        balance = altura_izq - altura_der
+
+        if -1 <= balance <= 1: return raiz
+
+        # Una rotación solo cambia los hijos del nodo, de su hijo más alto y del nieto interior:
+        # se descuenta lo que aportaban a las estadísticas antes de rotar y se suma lo de después.
+        afectados = (raiz, izquierdo, izquierdo.derecho) if balance > 1 else (raiz, derecho, derecho.izquierdo)
+        hojas_antes, completos_antes = self._contar_tipos(afectados)
+        if balance > 1:
+            # Caso Izquierda-Derecha (LR): primero se rota el hijo a la izquierda.
+            if (izquierdo.izquierdo.altura if izquierdo.izquierdo else 0) < (izquierdo.derecho.altura if izquierdo.derecho else 0):
+                raiz.izquierdo = self.rotacion_izquierda(raiz.izquierdo)
+            # Caso Izquierda-Izquierda (LL) -> Rotación Derecha Simple
+            nueva_raiz = self.rotacion_derecha(raiz)
+        else:
+            # Caso Derecha-Izquierda (RL): primero se rota el hijo a la derecha.
+            if (derecho.izquierdo.altura if derecho.izquierdo else 0) > (derecho.derecho.altura if derecho.derecho else 0):
+                raiz.derecho = self.rotacion_derecha(raiz.derecho)
+            # Caso Derecha-Derecha (RR) -> Rotación Izquierda Simple
+            nueva_raiz = self.rotacion_izquierda(raiz)
+        hojas_despues, completos_despues = self._contar_tipos(afectados)
+        self.hojas += hojas_despues - hojas_antes
+        self.nodos_completos += completos_despues - completos_antes
+        return nueva_raiz
+
+    def _reajustar_camino(self, raiz, camino):
+        """
+        Recorre de abajo hacia arriba el camino guardado durante el descenso, actualizando
+        alturas y rotando donde haga falta. Cada elemento del camino es (nodo, fue_a_la_izquierda),
+        lo que permite volver a colgar el subárbol rotado en el lado correcto de su padre.
+        """
+        for i in range(len(camino) - 1, -1, -1):
+            nodo = camino[i][0]
+            altura_previa = nodo.altura
+            nueva_raiz = self._balancear(nodo)
+            if i == 0:
+                raiz = nueva_raiz
+            else:
+                padre, fue_a_la_izquierda = camino[i - 1]
+                if fue_a_la_izquierda: padre.izquierdo = nueva_raiz
+                else: padre.derecho = nueva_raiz
+            # Si el subárbol no rotó ni cambió de altura, los ancestros tampoco cambian.
+            if nueva_raiz is nodo and nodo.altura == altura_previa: break
         return raiz
 
-    def obtener_minimo(self, raiz):
-        """Encuentra el nodo con el valor mínimo en un subárbol (el que está más a la izquierda)."""
-        if raiz is None or raiz.izquierdo is None: return raiz
-        return self.obtener_minimo(raiz.izquierdo)
+    def insertar(self, raiz, clave):
+        """Inserta una clave en el árbol y realiza el balanceo si es necesario."""
+        # 1. Inserción estándar de un Árbol Binario de Búsqueda (BST), bajando con un bucle
+        # y guardando el camino recorrido en lugar de usar recursión.
+        camino = []
+        actual = raiz
+        while actual:
+            fue_a_la_izquierda = clave < actual.clave
+            camino.append((actual, fue_a_la_izquierda))
+            actual = actual.izquierdo if fue_a_la_izquierda else actual.derecho
+
+        nuevo = Nodo(clave)
+        self.hojas += 1 # El nodo nuevo siempre es una hoja.
+        if not camino: return nuevo
+        padre, fue_a_la_izquierda = camino[-1]
+        # Si el padre era una hoja deja de serlo; si ya tenía un hijo, pasa a tener dos.
+        if padre.izquierdo is None and padre.derecho is None: self.hojas -= 1
+        else: self.nodos_completos += 1
+        if fue_a_la_izquierda: padre.izquierdo = nuevo
+        else: padre.derecho = nuevo
+
+        # 2. Subir por el camino actualizando alturas y aplicando las rotaciones necesarias.
+        return self._reajustar_camino(raiz, camino)
 
     def eliminar(self, raiz, clave):
         """Elimina una clave del árbol y realiza el balanceo si es necesario."""
-        # 1. Eliminación estándar de un BST
-        if not raiz: return raiz
-        if clave < raiz.clave: raiz.izquierdo = self.eliminar(raiz.izquierdo, clave)
-        elif clave > raiz.clave: raiz.derecho = self.eliminar(raiz.derecho, clave)
-        else:
-            # Nodo con uno o cero hijos
-            if raiz.izquierdo is None: return raiz.derecho
-            elif raiz.derecho is None: return raiz.izquierdo
-            # Nodo con dos hijos: obtener el sucesor inorden (el más pequeño del subárbol derecho)
-            sucesor = self.obtener_minimo(raiz.derecho)
-            raiz.clave = sucesor.clave
-            raiz.derecho = self.eliminar(raiz.derecho, sucesor.clave) # Eliminar el sucesor
-
-        if raiz is None: return raiz
-
-        # 2. Actualizar altura y balancear (similar a la inserción)
-        raiz.altura = 1 + max(self.obtener_altura(raiz.izquierdo), self.obtener_altura(raiz.derecho))
-        balance = self.obtener_balance(raiz)
-
-        # 3. Lógica de balanceo post-eliminación
-        # Caso Izquierda-Izquierda (LL)
-        if balance > 1 and self.obtener_balance(raiz.izquierdo) >= 0:
-            return self.rotacion_derecha(raiz)
-        # Caso Izquierda-Derecha (LR)
-        if balance > 1 and self.obtener_balance(raiz.izquierdo) < 0:
-            raiz.izquierdo = self.rotacion_izquierda(raiz.izquierdo)
-            return self.rotacion_derecha(raiz)
-        # Caso Derecha-Derecha (RR)
-        if balance < -1 and self.obtener_balance(raiz.derecho) <= 0:
-            return self.rotacion_izquierda(raiz)
-        # Caso Derecha-Izquierda (RL)
-        if balance < -1 and self.obtener_balance(raiz.derecho) > 0:
-            raiz.derecho = self.rotacion_derecha(raiz.derecho)
-            return self.rotacion_izquierda(raiz)
-
-        return raiz
+        # 1. Búsqueda estándar de un BST, guardando el camino recorrido.
+        camino = []
+        actual = raiz
+        while actual and actual.clave != clave:
+            fue_a_la_izquierda = clave < actual.clave
+            camino.append((actual, fue_a_la_izquierda))
+            actual = actual.izquierdo if fue_a_la_izquierda else actual.derecho
+        if actual is None: return raiz
+
+        # Nodo con dos hijos: se copia la clave del sucesor inorden (el más pequeño del
+        # subárbol derecho) y se pasa a eliminar el sucesor, que tiene como mucho un hijo.
+        if actual.izquierdo is not None and actual.derecho is not None:
+            camino.append((actual, False))
+            sucesor = actual.derecho
+            while sucesor.izquierdo is not None:
+                camino.append((sucesor, True))
+                sucesor = sucesor.izquierdo
+            actual.clave, actual.clave_texto = sucesor.clave, sucesor.clave_texto
+            actual = sucesor
+
+        # Nodo con uno o cero hijos: su único hijo (o None) ocupa su lugar.
+        reemplazo = actual.izquierdo if actual.izquierdo is not None else actual.derecho
+        if reemplazo is None: self.hojas -= 1 # Se quita una hoja.
+        if not camino: return reemplazo
+        padre, fue_a_la_izquierda = camino[-1]
+        if reemplazo is None:
+            # El padre pierde un hijo: si tenía dos deja de estar completo; si tenía uno, pasa a ser hoja.
+            if padre.izquierdo is not None and padre.derecho is not None: self.nodos_completos -= 1
+            else: self.hojas += 1
+        if fue_a_la_izquierda: padre.izquierdo = reemplazo
+        else: padre.derecho = reemplazo
+
+        # 2. Actualizar alturas y balancear de abajo hacia arriba (igual que en la inserción).
+        return self._reajustar_camino(raiz, camino)
 
 # ==============================================================================
 # --- CLASE App (Interfaz con Layout Izquierda/Derecha) ---
@@ -213,11 +312,24 @@ class App:
 
         # --- Variables de estado de la aplicación ---
         self.arbol_avl_obj = ArbolAVL()         # Instancia de la lógica AVL.
+        # Las listas de claves (claves_avl, claves_perfecto, claves_ingresadas) se mantienen siempre
+        # ordenadas, para mostrarlas sin volver a ordenarlas.
         self.raiz_avl, self.claves_avl = None, [] # Datos del árbol AVL.
         self.raiz_perfecto, self.claves_perfecto = None, [] # Datos del árbol perfecto.
+        self.estadisticas_perfecto = None       # (nodos, hojas, altura, grado) del árbol perfecto, calculadas al generarlo.
         self.raiz_actual, self.claves_ingresadas = None, [] # Punteros al árbol actualmente seleccionado.
+        # Conjuntos paralelos a las listas de claves, para comprobar en O(1) si una clave ya existe.
+        self.claves_avl_set, self.claves_perfecto_set, self._claves_set = set(), set(), set()
         self.tipo_arbol_seleccionado = None     # Flag para saber qué modo está activo ('AVL' o 'PERFECTO').
         self.photo_img = None                   # Variable para mantener una referencia a la imagen del árbol.
+        self._cache_render = OrderedDict()      # Caché LRU: firma del árbol -> imagen de Pillow a tamaño completo.
+        self._cache_miniaturas = OrderedDict()  # Caché LRU: (firma, ancho, alto) -> imagen ya ajustada al panel.
+        self._titulo_pendiente = None           # Título de la próxima actualización de la UI (si hay una programada).
+        self._actualizacion_programada = None   # Identificador de la llamada 'after_idle' pendiente, o None.
+        self._ejecutor_render = ThreadPoolExecutor(max_workers=1) # Hilo donde se ejecuta Graphviz.
+        self._generacion_render = 0             # Contador para descartar imágenes de renderizados ya obsoletos.
+        self._futuro_render = None              # Último renderizado enviado al hilo (para poder cancelarlo).
+        self.root.protocol("WM_DELETE_WINDOW", self.cerrar_app) # Al cerrar la ventana se detiene también el hilo.
 
         # --- Definición de fuentes para la UI ---
         self.font_label = font.Font(family="Helvetica", size=12)
@@ -287,23 +399,37 @@ class App:
         for widget in [self.label_entrada, self.entry_claves, self.btn_accion_principal, self.btn_eliminar, self.btn_reiniciar_actual]: widget.config(state=tk.DISABLED)
         self.entry_claves.delete(0, tk.END)
         self.label_info.config(text="Bienvenido.\n\nPor favor, elija un tipo de árbol para empezar.")
-        self.label_imagen.config(image='')
+        self.label_imagen.config(image='', text='')
         self.photo_img = None
+        self._descartar_render_pendiente() # Descarta cualquier imagen que se esté generando todavía.
+        # Si quedaba una actualización pendiente, se cancela para no pisar el mensaje de bienvenida.
+        if self._actualizacion_programada is not None:
+            self.root.after_cancel(self._actualizacion_programada)
+            self._actualizacion_programada = None
 
     def reiniciar_app(self):
         """Reinicia la aplicación por completo, borrando ambos árboles."""
         if not messagebox.askyesno("Confirmar Reinicio Total", "Esto borrará TODOS los árboles (AVL y Perfecto).\n¿Está seguro?"): return
         self.raiz_avl, self.claves_avl = None, []
+        self.arbol_avl_obj.recalcular_estadisticas(None)
         self.raiz_perfecto, self.claves_perfecto = None, []
+        self.estadisticas_perfecto = None
         self.raiz_actual, self.claves_ingresadas = None, []
+        self.claves_avl_set, self.claves_perfecto_set, self._claves_set = set(), set(), set()
         self.tipo_arbol_seleccionado = None
         self.configurar_ui_inicial()
 
+    def cerrar_app(self):
+        """Cierra la ventana y detiene el hilo de renderizado, cancelando lo que tuviera pendiente."""
+        self._ejecutor_render.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+
     def seleccionar_modo_avl(self):
         """Configura la UI para operar en el modo Árbol AVL."""
         self.tipo_arbol_seleccionado = 'AVL'
         # Apunta las variables "actuales" a los datos del árbol AVL.
         self.raiz_actual, self.claves_ingresadas = self.raiz_avl, self.claves_avl
+        self._claves_set = self.claves_avl_set
         # Actualiza el estado de los botones y textos.
         self.btn_seleccionar_avl.config(state=tk.DISABLED)
         self.btn_seleccionar_perfecto.config(state=tk.NORMAL)
@@ -312,13 +438,14 @@ class App:
         self.btn_accion_principal.config(text="Insertar", command=self.accion_insertar_avl, state=tk.NORMAL)
         self.btn_eliminar.config(state=tk.NORMAL, command=self.accion_eliminar_nodo)
         self.btn_reiniciar_actual.config(state=tk.NORMAL)
-        self.actualizar_ui("Modo Árbol AVL activado.")
+        self._programar_actualizacion_ui("Modo Árbol AVL activado.")
 
     def seleccionar_modo_perfecto(self):
         """Configura la UI para operar en el modo Árbol Perfecto."""
         self.tipo_arbol_seleccionado = 'PERFECTO'
         # Apunta las variables "actuales" a los datos del árbol Perfecto.
         self.raiz_actual, self.claves_ingresadas = self.raiz_perfecto, self.claves_perfecto
+        self._claves_set = self.claves_perfecto_set
         # Reconfigura los botones para las acciones del árbol perfecto.
         self.btn_seleccionar_avl.config(state=tk.NORMAL)
         self.btn_seleccionar_perfecto.config(state=tk.DISABLED)
@@ -327,7 +454,7 @@ class App:
         self.btn_accion_principal.config(text="Generar Árbol", command=self.accion_generar_perfecto, state=tk.NORMAL)
         self.btn_eliminar.config(state=tk.NORMAL, command=self.accion_eliminar_no_disponible) # Deshabilita la eliminación lógica.
         self.btn_reiniciar_actual.config(state=tk.NORMAL)
-        self.actualizar_ui("Modo Árbol Perfecto activado.")
+        self._programar_actualizacion_ui("Modo Árbol Perfecto activado.")
 
     def accion_eliminar_no_disponible(self):
         """Muestra un mensaje informativo indicando por qué la eliminación no está disponible."""
@@ -342,10 +469,14 @@ class App:
         if not messagebox.askyesno("Confirmar Reinicio Local", f"¿Desea reiniciar el Árbol {self.tipo_arbol_seleccionado} actual?"): return
         
         # Borra los datos del árbol correspondiente al modo actual.
-        if self.tipo_arbol_seleccionado == 'AVL': self.raiz_avl, self.claves_avl = None, []
-        elif self.tipo_arbol_seleccionado == 'PERFECTO': self.raiz_perfecto, self.claves_perfecto = None, []
-        self.raiz_actual, self.claves_ingresadas = None, []
-        self.actualizar_ui(f"Árbol {self.tipo_arbol_seleccionado} reiniciado.")
+        if self.tipo_arbol_seleccionado == 'AVL':
+            self.raiz_avl, self.claves_avl, self.claves_avl_set = None, [], set()
+            self.arbol_avl_obj.recalcular_estadisticas(None)
+        elif self.tipo_arbol_seleccionado == 'PERFECTO':
+            self.raiz_perfecto, self.claves_perfecto, self.claves_perfecto_set = None, [], set()
+            self.estadisticas_perfecto = None
+        self.raiz_actual, self.claves_ingresadas, self._claves_set = None, [], set()
+        self._programar_actualizacion_ui(f"Árbol {self.tipo_arbol_seleccionado} reiniciado.")
 
     def accion_insertar_avl(self):
         """Procesa la entrada del usuario para insertar nodos en el Árbol AVL."""
@@ -354,16 +485,31 @@ class App:
             if not claves_str: return
             claves_nuevas = [int(item) for item in claves_str]
             nodos_insertados_count = 0
-            for clave in claves_nuevas:
-                if clave not in self.claves_ingresadas:
-                    self.claves_ingresadas.append(clave)
-                    # Llama al método de inserción de la clase ArbolAVL.
-                    self.raiz_actual = self.arbol_avl_obj.insertar(self.raiz_actual, clave)
-                    nodos_insertados_count += 1
+            # Si llegan muchas claves a la vez, es más rápido reconstruirlo desde las claves
+            # ordenadas: el árbol perfecto resultante ya cumple las condiciones de un AVL (alturas
+            # incluidas) y se construye en tiempo lineal. En el resto de casos se inserta clave a
+            # clave, para mostrar el árbol que produce de verdad la inserción AVL.
+            if len(claves_nuevas) > UMBRAL_INSERCION_MASIVA:
+                # Las claves nuevas se obtienen con operaciones de conjuntos, sin recorrerlas una a una.
+                claves_agregadas = set(claves_nuevas) - self._claves_set
+                nodos_insertados_count = len(claves_agregadas)
+                if claves_agregadas:
+                    self._claves_set |= claves_agregadas
+                    self.claves_ingresadas = sorted(self._claves_set)
+                    self.raiz_actual = construir_arbol_perfecto(self.claves_ingresadas, ya_ordenadas=True)
+                    self.arbol_avl_obj.recalcular_estadisticas(self.raiz_actual)
+            else:
+                for clave in claves_nuevas:
+                    if clave not in self._claves_set:
+                        self._claves_set.add(clave)
+                        bisect.insort(self.claves_ingresadas, clave)
+                        # Llama al método de inserción de la clase ArbolAVL.
+                        self.raiz_actual = self.arbol_avl_obj.insertar(self.raiz_actual, clave)
+                        nodos_insertados_count += 1
             if nodos_insertados_count > 0:
                 # Guarda el estado del árbol actual en las variables del modo AVL.
-                self.raiz_avl, self.claves_avl = self.raiz_actual, self.claves_ingresadas
-                self.actualizar_ui(f"Insertados {nodos_insertados_count} nodo(s).")
+                self.raiz_avl, self.claves_avl, self.claves_avl_set = self.raiz_actual, self.claves_ingresadas, self._claves_set
+                self._programar_actualizacion_ui(f"Insertados {nodos_insertados_count} nodo(s).")
             else: messagebox.showinfo("Sin Cambios", "No se insertaron nodos (posiblemente ya existían).")
         except (ValueError, TypeError): messagebox.showerror("Error", "Ingrese solo números enteros separados por espacios.")
         finally: self.entry_claves.delete(0, tk.END) # Limpia el campo de entrada.
@@ -376,15 +522,16 @@ class App:
                 messagebox.showwarning("Entrada vacía", "Por favor ingrese un número para eliminar.")
                 return
             clave = int(clave_str)
-            if clave not in self.claves_ingresadas:
+            if clave not in self._claves_set:
                 messagebox.showwarning("No Encontrado", f"El nodo {clave} no existe.")
                 return
-            self.claves_ingresadas.remove(clave)
+            self._claves_set.remove(clave)
+            del self.claves_ingresadas[bisect.bisect_left(self.claves_ingresadas, clave)]
             # Llama al método de eliminación de la clase ArbolAVL.
             self.raiz_actual = self.arbol_avl_obj.eliminar(self.raiz_actual, clave)
             # Guarda el estado actualizado.
-            self.raiz_avl, self.claves_avl = self.raiz_actual, self.claves_ingresadas
-            self.actualizar_ui(f"Nodo {clave} eliminado")
+            self.raiz_avl, self.claves_avl, self.claves_avl_set = self.raiz_actual, self.claves_ingresadas, self._claves_set
+            self._programar_actualizacion_ui(f"Nodo {clave} eliminado")
         except (ValueError, TypeError): messagebox.showerror("Error", "Para eliminar, ingrese un único número entero.")
         finally: self.entry_claves.delete(0, tk.END)
 
@@ -396,27 +543,52 @@ class App:
                 messagebox.showwarning("Entrada vacía", "Por favor ingrese números para generar el árbol.")
                 return
             # Llama a la función de construcción del árbol perfecto.
-            self.claves_ingresadas = sorted(list(set(claves)))
-            self.raiz_actual = construir_arbol_perfecto(self.claves_ingresadas)
+            self._claves_set = set(claves)
+            self.claves_ingresadas = sorted(self._claves_set)
+            self.raiz_actual = construir_arbol_perfecto(self.claves_ingresadas, ya_ordenadas=True)
+            # El árbol perfecto no cambia después de generarse: sus estadísticas se calculan una sola vez.
+            self.estadisticas_perfecto = estadisticas(self.raiz_actual)
             # Guarda el estado.
-            self.raiz_perfecto, self.claves_perfecto = self.raiz_actual, self.claves_ingresadas
-            self.actualizar_ui("Árbol Perfecto generado")
+            self.raiz_perfecto, self.claves_perfecto, self.claves_perfecto_set = self.raiz_actual, self.claves_ingresadas, self._claves_set
+            self._programar_actualizacion_ui("Árbol Perfecto generado")
         except (ValueError, TypeError): messagebox.showerror("Error", "Ingrese solo números enteros separados por espacios.")
         finally: self.entry_claves.delete(0, tk.END)
 
+    def _programar_actualizacion_ui(self, titulo_info):
+        """
+        Programa una actualización de la UI para cuando Tkinter quede libre. Si se piden varias
+        en el mismo ciclo de eventos, se agrupan en una sola (con el último título), de modo que
+        Graphviz se ejecuta una única vez.
+        """
+        self._titulo_pendiente = titulo_info
+        if self._actualizacion_programada is None:
+            self._actualizacion_programada = self.root.after_idle(self._ejecutar_actualizacion_ui)
+
+    def _ejecutar_actualizacion_ui(self):
+        """Ejecuta la actualización de la UI que estaba programada."""
+        self._actualizacion_programada = None
+        self.actualizar_ui(self._titulo_pendiente)
+
     def actualizar_ui(self, titulo_info):
         """Refresca toda la información visual (estadísticas y gráfico del árbol)."""
         if not self.claves_ingresadas or self.tipo_arbol_seleccionado is None:
             self.label_info.config(text=f"--- {titulo_info} ---\n\nEl árbol para el modo '{self.tipo_arbol_seleccionado}' está vacío.")
-            self.label_imagen.config(image='')
+            self.label_imagen.config(image='', text='')
             self.photo_img = None
+            self._descartar_render_pendiente()
             return
 
-        # 1. Calcular todas las estadísticas usando las funciones auxiliares.
-        orden, peso = len(self.claves_ingresadas), len(self.claves_ingresadas)
-        hojas = contar_hojas(self.raiz_actual)
+        # 1. Calcular las estadísticas sin recorrer el árbol: las del perfecto ya se calcularon al
+        # generarlo; las del AVL salen de los contadores que mantiene al insertar y eliminar.
+        if self.tipo_arbol_seleccionado == 'PERFECTO':
+            peso, hojas, altura, grado = self.estadisticas_perfecto
+        else:
+            avl = self.arbol_avl_obj
+            peso, hojas, altura = len(self._claves_set), avl.hojas, self.raiz_actual.altura
+            # Con algún nodo de dos hijos el grado es 2; si no, es 1 salvo que solo haya un nodo.
+            grado = 2 if avl.nodos_completos else min(peso - 1, 1)
+        orden = peso
         nodos_internos, conexiones = orden - hojas, max(0, orden - 1)
-        altura, grado = calcular_altura_arbol(self.raiz_actual), calcular_grado_arbol(self.raiz_actual)
 
         # 2. Formatear el texto de las estadísticas y mostrarlo.
         texto_info = (f"--- {titulo_info} ---\n\n"
@@ -428,37 +600,95 @@ class App:
                       f"Conexiones (Ramas) : {conexiones}\n"
                       f"Hojas (Terminales) : {hojas}\n"
                       f"Nodos Internos     : {nodos_internos}\n\n"
-                      f"Claves del Árbol:\n{sorted(self.claves_ingresadas)}")
+                      f"Claves del Árbol:\n{self.claves_ingresadas}")
         self.label_info.config(text=texto_info)
         
-        # 3. Generar la imagen del árbol usando Graphviz.
-        g = graphviz.Digraph('Arbol')
-        g.attr('node', shape='circle', style='filled', fillcolor='skyblue')
-        
-        def construir_grafo(nodo):
-            """Función recursiva interna para añadir nodos y aristas al grafo."""
-            if nodo:
-                g.node(str(nodo.clave))
-                if nodo.izquierdo: g.edge(str(nodo.clave), str(nodo.izquierdo.clave)); construir_grafo(nodo.izquierdo)
-                if nodo.derecho: g.edge(str(nodo.clave), str(nodo.derecho.clave)); construir_grafo(nodo.derecho)
-        
-        construir_grafo(self.raiz_actual)
-        
+        # 3. Buscar la imagen en la caché: si ya se dibujó un árbol con la misma estructura
+        # (por ejemplo al cambiar de modo o volver a un estado anterior) no se llama a Graphviz.
+        # La firma es además una copia inmutable del árbol, que es lo que se dibuja en segundo plano.
+        firma = firma_estructura(self.raiz_actual)
+        tamano_panel = (self.panel_derecho.winfo_width(), self.panel_derecho.winfo_height())
+        self._descartar_render_pendiente() # Cualquier renderizado anterior queda obsoleto.
+        photo_img = self._buscar_en_cache(self._cache_miniaturas, (firma,) + tamano_panel)
+        if photo_img is not None:
+            self._mostrar_imagen(photo_img)
+            return
+
+        # 4. Si no está en caché, Graphviz trabaja en un hilo aparte para no congelar la ventana.
+        # El hilo no toca Tkinter: es el propio bucle de Tkinter el que revisa cuándo ha terminado.
+        # Mientras tanto se quita la imagen anterior, que podría ser de otro árbol o de otro modo.
+        self.label_imagen.config(image='', text="Generando gráfico...")
+        self.photo_img = None
+        img = self._buscar_en_cache(self._cache_render, firma)
+        self._futuro_render = self._ejecutor_render.submit(self._preparar_imagen, firma, img, tamano_panel)
+        self.root.after(INTERVALO_REVISION_RENDER_MS, self._revisar_render, self._futuro_render, self._generacion_render, firma, tamano_panel)
+
+    def _descartar_render_pendiente(self):
+        """
+        Marca como obsoleto cualquier renderizado anterior y cancela el último enviado al hilo,
+        para que no se acumulen ejecuciones de 'dot' que ya nadie va a mostrar.
+        """
+        self._generacion_render += 1
+        if self._futuro_render is not None:
+            self._futuro_render.cancel() # Solo tiene efecto si todavía no había empezado.
+            self._futuro_render = None
+
+    def _preparar_imagen(self, firma, img, tamano_panel):
+        """
+        Se ejecuta en el hilo de renderizado: dibuja el árbol si no había imagen en caché y
+        devuelve la imagen completa junto con una copia ajustada al tamaño del panel.
+        """
+        if img is None: img = self._renderizar_arbol(firma)
+        # Ajustar una copia al tamaño del panel, manteniendo la proporción.
+        miniatura = img.copy()
+        miniatura.thumbnail(tamano_panel, Image.Resampling.LANCZOS)
+        return img, miniatura
+
+    def _revisar_render(self, futuro, generacion, firma, tamano_panel):
+        """Comprueba (desde el hilo de Tkinter) si el renderizado terminó; si no, vuelve a mirar más tarde."""
+        if futuro.done(): self._aplicar_imagen(futuro, generacion, firma, tamano_panel)
+        else: self.root.after(INTERVALO_REVISION_RENDER_MS, self._revisar_render, futuro, generacion, firma, tamano_panel)
+
+    def _aplicar_imagen(self, futuro, generacion, firma, tamano_panel):
+        """Guarda en caché la imagen recién generada y la muestra, salvo que ya haya otra más reciente."""
         try:
-            # Renderiza el grafo en un archivo PNG temporal y lo limpia después.
-            nombre_archivo = "arbol_temp"
-            g.render(nombre_archivo, format='png', cleanup=True)
-            
-            # 4. Abrir la imagen con Pillow y mostrarla en la etiqueta de Tkinter.
-            img = Image.open(f"{nombre_archivo}.png")
-            # Ajusta el tamaño para que quepa en el panel, manteniendo la proporción.
-            img.thumbnail((self.panel_derecho.winfo_width(), self.panel_derecho.winfo_height()), Image.Resampling.LANCZOS)
-            self.photo_img = ImageTk.PhotoImage(img) # Convierte la imagen de PIL a un formato que Tkinter entiende.
-            self.label_imagen.config(image=self.photo_img)
-            self.label_imagen.image = self.photo_img # Mantiene una referencia para evitar que el recolector de basura la borre.
+            img, miniatura = futuro.result()
+        except CancelledError:
+            return # Se canceló porque llegó otra actualización antes de empezar a dibujar.
         except Exception as e:
-            messagebox.showerror("Error de Graphviz", f"No se pudo generar el gráfico.\nAsegúrese de que Graphviz esté instalado y en el PATH.\n\nError: {e}")
-            self.label_imagen.config(image='', text="Error al generar gráfico.")
+            if generacion == self._generacion_render:
+                messagebox.showerror("Error de Graphviz", f"No se pudo generar el gráfico.\nAsegúrese de que Graphviz esté instalado y en el PATH.\n\nError: {e}")
+                self.label_imagen.config(image='', text="Error al generar gráfico.")
+            return
+        # Se guarda en caché aunque haya quedado obsoleta: puede volver a necesitarse.
+        self._guardar_en_cache(self._cache_render, firma, img)
+        photo_img = ImageTk.PhotoImage(miniatura) # Convierte la imagen de PIL a un formato que Tkinter entiende.
+        self._guardar_en_cache(self._cache_miniaturas, (firma,) + tamano_panel, photo_img)
+        if generacion == self._generacion_render: self._mostrar_imagen(photo_img)
+
+    def _mostrar_imagen(self, photo_img):
+        """Muestra una imagen ya convertida para Tkinter en el panel derecho."""
+        self.photo_img = photo_img
+        self.label_imagen.config(image=self.photo_img, text='')
+        self.label_imagen.image = self.photo_img # Mantiene una referencia para evitar que el recolector de basura la borre.
+
+    def _renderizar_arbol(self, firma):
+        """Dibuja con Graphviz el árbol descrito por su firma y devuelve la imagen de Pillow a tamaño completo."""
+        # Se pide el PNG directamente en memoria, sin escribir archivos temporales en disco.
+        png = graphviz.Source(generar_dot(firma), engine='dot').pipe(format='png')
+        return Image.open(io.BytesIO(png))
+
+    def _buscar_en_cache(self, cache, clave):
+        """Devuelve el valor guardado en una caché LRU (o None) y lo marca como usado recientemente."""
+        valor = cache.get(clave)
+        if valor is not None: cache.move_to_end(clave)
+        return valor
+
+    def _guardar_en_cache(self, cache, clave, valor):
+        """Guarda un valor en una caché LRU, descartando el menos usado si se supera el tamaño máximo."""
+        cache[clave] = valor
+        cache.move_to_end(clave)
+        if len(cache) > TAMANO_CACHE_RENDER: cache.popitem(last=False)
 
 # ==============================================================================
 # --- PUNTO DE ENTRADA DE LA APLICACIÓN ---